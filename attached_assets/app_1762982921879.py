@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+import shutil
 import tempfile
 import yt_dlp
 from dotenv import load_dotenv
@@ -17,11 +18,15 @@ transcribe_audio = main.transcribe_audio
 merge_audio_files = main.merge_audio_files
 replace_audio_in_video = main.replace_audio_in_video
 save_audio_to_file = main.save_audio_to_file
-spacy_models = main.spacy_models
+source_languages = main.language_codes
 
 # Load environment variables
 load_dotenv()
 
+# Buffer sizes for copying uploads to disk and reading results back
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_BUFFER_SIZE = 65536
+
 # Page configuration
 st.set_page_config(
     page_title="Video Dubber",
@@ -67,11 +72,19 @@ with st.sidebar:
     # Source language selection
     source_language = st.selectbox(
         "Source Language",
-        options=list(spacy_models.keys()),
+        options=list(source_languages.keys()),
         index=0,
         help="The language of the original video"
     )
     
+    # Speech recognition model, defaulting to the fastest suitable one for the source language
+    model_size = st.selectbox(
+        "Whisper Model",
+        options=main.whisper_model_sizes,
+        index=main.whisper_model_sizes.index(main.default_model_size(source_language.lower())),
+        help="distil-large-v3 is the fastest but English only, large-v3 is the most accurate"
+    )
+    
     # Target language/voice selection
     st.subheader("Target Language")
     
@@ -132,8 +145,15 @@ with tab1:
     
     if uploaded_file is not None:
         # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-            tmp_file.write(uploaded_file.read())
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1],
+                                         buffering=UPLOAD_CHUNK_SIZE) as tmp_file:
+            # Reserve the full size up front so the file is not extended (and fragmented) chunk by chunk
+            try:
+                os.posix_fallocate(tmp_file.fileno(), 0, uploaded_file.size)
+            except (AttributeError, OSError):
+                pass
+            # Stream in chunks rather than holding the whole video in memory
+            shutil.copyfileobj(uploaded_file, tmp_file, length=UPLOAD_CHUNK_SIZE)
             video_file_path = tmp_file.name
             st.success(f"✅ Video uploaded: {uploaded_file.name}")
 
@@ -174,6 +194,11 @@ if dub_button:
                     'outtmpl': os.path.join(tempfile.gettempdir(), '%(title)s.%(ext)s'),
                     'quiet': True,
                     'no_warnings': True,
+                    # Fetch DASH/HLS fragments in parallel and prefer non-throttled https formats
+                    'concurrent_fragment_downloads': 8,
+                    'http_chunk_size': 10 * 1024 * 1024,
+                    'buffersize': 1024 * 1024,
+                    'format_sort': ['proto:https'],
                 }
                 
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -210,32 +235,37 @@ if dub_button:
             # Step 1: Extract audio
             status_text.text("Step 1/5: Extracting audio from video...")
             progress_bar.progress(10)
-            audio_file = extract_audio_from_video(video_file_path)
+            audio_file, asr_audio_file = extract_audio_from_video(video_file_path)
             if audio_file is None:
                 st.error("❌ Failed to extract audio from video")
                 st.stop()
             
-            # Step 2: Transcribe audio
-            status_text.text("Step 2/5: Transcribing audio (this may take a while)...")
-            progress_bar.progress(30)
-            transcription = transcribe_audio(audio_file, source_language.lower())
-            if transcription is None:
-                st.error("❌ Failed to transcribe audio")
-                st.stop()
-            
-            # Step 3: Translate and merge audio
-            status_text.text("Step 3/5: Translating and creating dubbed audio...")
-            progress_bar.progress(50)
-            merged_audio, ducked_audio = merge_audio_files(
-                transcription,
-                source_language.lower(),
-                target_language_code,
-                target_voice,
-                audio_file
-            )
-            if merged_audio is None:
-                st.error("❌ Failed to create dubbed audio")
-                st.stop()
+            try:
+                # Step 2: Start transcription, segments are decoded while the next step consumes them
+                status_text.text("Step 2/5: Starting transcription...")
+                progress_bar.progress(30)
+                transcription = transcribe_audio(asr_audio_file, source_language.lower(), model_size)
+                if transcription is None:
+                    st.error("❌ Failed to transcribe audio")
+                    st.stop()
+                
+                # Step 3: Transcribe, translate and merge audio
+                status_text.text("Step 3/5: Transcribing, translating and creating dubbed audio (this may take a while)...")
+                progress_bar.progress(50)
+                merged_audio, ducked_audio = merge_audio_files(
+                    transcription,
+                    source_language.lower(),
+                    target_language_code,
+                    target_voice,
+                    audio_file
+                )
+                if merged_audio is None:
+                    st.error("❌ Failed to transcribe or create dubbed audio, see the console for details")
+                    st.stop()
+            finally:
+                # The Whisper copy of the audio is only needed until transcription has been consumed
+                if os.path.exists(asr_audio_file):
+                    os.remove(asr_audio_file)
             
             # Step 4: Replace audio in video
             status_text.text("Step 4/5: Replacing audio in video...")
@@ -274,7 +304,7 @@ if dub_button:
             
             with col1:
                 if os.path.exists(output_video_path):
-                    with open(output_video_path, "rb") as video_file:
+                    with open(output_video_path, "rb", buffering=DOWNLOAD_BUFFER_SIZE) as video_file:
                         st.download_button(
                             label="📹 Download Dubbed Video",
                             data=video_file,
@@ -285,7 +315,7 @@ if dub_button:
             
             with col2:
                 if os.path.exists(output_audio_path):
-                    with open(output_audio_path, "rb") as audio_file:
+                    with open(output_audio_path, "rb", buffering=DOWNLOAD_BUFFER_SIZE) as audio_file:
                         st.download_button(
                             label="🔊 Download Audio Only",
                             data=audio_file,
@@ -309,7 +339,7 @@ if dub_button:
 st.markdown("---")
 st.markdown("""
     <div style='text-align: center; color: #666; padding: 2rem;'>
-        <p>Powered by Whisper ASR, Lingo Translation, Google Text-to-Speech, Spacy, PyDub, and MoviePy</p>
+        <p>Powered by Whisper ASR, Lingo Translation, Google Text-to-Speech, PyDub, and FFmpeg</p>
     </div>
 """, unsafe_allow_html=True)
 
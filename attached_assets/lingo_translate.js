@@ -0,0 +1,91 @@
+// Lingo.dev translation helper used by the video dubber (main.py)
+//
+// One-shot mode:
+//   node lingo_translate.js <sourceLocale> <targetLocale> <text1> <text2> ...
+//   Prints one JSON-encoded translation per line.
+//
+// Server mode:
+//   node lingo_translate.js --server <socketPath>
+//   Listens for HTTP requests on a Unix domain socket. POST /translate accepts
+//   {"src", "tgt", "texts"} and streams NDJSON lines of the form
+//   {"translations": {"<index>": "<translation>", ...}} as each chunk of the batch
+//   is translated, or {"error": "..."} if the translation fails.
+import { LingoDotDevEngine } from "lingo.dev/sdk";
+import { createServer } from "http";
+import { existsSync, unlinkSync } from "fs";
+
+const lingoDotDev = new LingoDotDevEngine({
+  apiKey: process.env.LINGODOTDEV_API_KEY || process.env.LINGO_API_KEY || "",
+});
+
+async function translateTexts(sourceLocale, targetLocale, texts, onTranslations = () => {}) {
+  // Translate the whole batch in a single request, keyed by position
+  const payload = Object.fromEntries(texts.map((text, index) => [String(index), text]));
+  const sent = new Set();
+  const emit = (translations) => {
+    const fresh = Object.fromEntries(Object.entries(translations).filter(([index]) => !sent.has(index)));
+    Object.keys(fresh).forEach((index) => sent.add(index));
+    if (Object.keys(fresh).length > 0) onTranslations(fresh);
+  };
+
+  const translated = await lingoDotDev.localizeObject(
+    payload,
+    {
+      sourceLocale: sourceLocale === "auto" ? null : sourceLocale,
+      targetLocale,
+    },
+    // The SDK translates large payloads in chunks, pass each one on as soon as it is done
+    (progress, sourceChunk, processedChunk) => emit(processedChunk),
+  );
+  const missing = texts.filter((text, index) => typeof translated[String(index)] !== "string");
+  if (missing.length > 0) {
+    throw new Error(`Missing translations for ${missing.length} of ${texts.length} texts`);
+  }
+  emit(translated);
+  return texts.map((text, index) => translated[String(index)]);
+}
+
+function serve(socketPath) {
+  const server = createServer(async (req, res) => {
+    if (req.method !== "POST" || req.url !== "/translate") {
+      res.writeHead(404).end();
+      return;
+    }
+
+    let body = "";
+    req.setEncoding("utf8");
+    for await (const chunk of req) body += chunk;
+
+    res.writeHead(200, { "Content-Type": "application/x-ndjson" });
+    try {
+      const { src, tgt, texts } = JSON.parse(body);
+      await translateTexts(src, tgt, texts, (translations) => {
+        res.write(JSON.stringify({ translations }) + "\n");
+      });
+    } catch (error) {
+      res.write(JSON.stringify({ error: error.message }) + "\n");
+    }
+    res.end();
+  });
+
+  if (existsSync(socketPath)) unlinkSync(socketPath);
+  server.listen(socketPath);
+}
+
+async function main() {
+  if (process.argv[2] === "--server") {
+    serve(process.argv[3]);
+    return;
+  }
+
+  const [sourceLocale, targetLocale, ...texts] = process.argv.slice(2);
+  const translations = await translateTexts(sourceLocale, targetLocale, texts);
+  for (const translation of translations) {
+    process.stdout.write(JSON.stringify(translation) + "\n");
+  }
+}
+
+main().catch((error) => {
+  console.error(error.message);
+  process.exit(1);
+});
@@ -1,87 +1,244 @@
 import argparse
+import atexit
+import functools
+import hashlib
+import io
+import json
 import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from pydub import AudioSegment
-from moviepy.editor import VideoFileClip, AudioFileClip
 from google.cloud import texttospeech
 from google.cloud import translate_v2 as translate
-import whisper
-import spacy
-from spacy_syllables import SpacySyllables
+import ctranslate2
+from faster_whisper import WhisperModel
 from tqdm import tqdm
 import tempfile
 import re
 import requests
+import httpx
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-spacy_models = {
-    "english": "en_core_web_sm",
-    "german": "de_core_news_sm",
-    "french": "fr_core_news_sm",
-    "italian": "it_core_news_sm",
-    "catalan": "ca_core_news_sm",
-    "chinese": "zh_core_web_sm",
-    "croatian": "hr_core_news_sm",
-    "danish": "da_core_news_sm",
-    "dutch": "nl_core_news_sm",
-    "finnish": "fi_core_news_sm",
-    "greek": "el_core_news_sm",
-    "japanese": "ja_core_news_sm",
-    "korean": "ko_core_news_sm",
-    "lithuanian": "lt_core_news_sm",
-    "macedonian": "mk_core_news_sm",
-    "polish": "pl_core_news_sm",
-    "portuguese": "pt_core_news_sm",
-    "romanian": "ro_core_news_sm",
-    "russian": "ru_core_news_sm",
-    "spanish": "es_core_news_sm",
-    "swedish": "sv_core_news_sm",
-    "ukrainian": "uk_core_news_sm"
+language_codes = {
+    "english": "en",
+    "german": "de",
+    "french": "fr",
+    "italian": "it",
+    "catalan": "ca",
+    "chinese": "zh",
+    "croatian": "hr",
+    "danish": "da",
+    "dutch": "nl",
+    "finnish": "fi",
+    "greek": "el",
+    "japanese": "ja",
+    "korean": "ko",
+    "lithuanian": "lt",
+    "macedonian": "mk",
+    "polish": "pl",
+    "portuguese": "pt",
+    "romanian": "ro",
+    "russian": "ru",
+    "spanish": "es",
+    "swedish": "sv",
+    "ukrainian": "uk"
 }
 
 
 def extract_audio_from_video(video_file):
+    """
+    Extract the audio track at its original quality for dubbing, plus a 16 kHz mono copy
+    in the exact format Whisper expects, in a single ffmpeg pass
+    """
     try:
         print("Extracting audio track")
-        video = VideoFileClip(video_file)
-        audio = video.audio
         audio_file = os.path.splitext(video_file)[0] + ".wav"
-        audio.write_audiofile(audio_file)
-        return audio_file
+        asr_audio_file = os.path.splitext(video_file)[0] + "_asr.wav"
+        subprocess.run(
+            ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", video_file,
+             "-vn", "-acodec", "pcm_s16le", audio_file,
+             "-vn", "-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le", asr_audio_file],
+            capture_output=True, check=True
+        )
+        return audio_file, asr_audio_file
     except Exception as e:
         print(f"Error extracting audio from video: {e}")
-        return None
+        return None, None
+
+
+@functools.lru_cache(maxsize=2)
+def _get_whisper_model(size):
+    # Loading is expensive (gigabytes of weights), so keep the model warm across calls
+    if ctranslate2.get_cuda_device_count() > 0:
+        return WhisperModel(size, device="cuda", compute_type="float16")
+    return WhisperModel(size, device="cpu", compute_type="int8")
+
 
+def _segment_to_dict(segment):
+    # Same layout as openai-whisper's transcription segments
+    return {
+        "start": segment.start,
+        "end": segment.end,
+        "text": segment.text,
+        "words": [
+            {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+            for word in segment.words
+        ]
+    }
 
-def transcribe_audio(audio_file, source_language):
+
+def _decode_segments(segments):
+    # Decoding happens lazily while the segments are consumed, report failures (e.g. CUDA libraries
+    # failing to load on the first encode) as transcription errors rather than merge errors
     try:
-        print("Transcribing audio track")
-        model = whisper.load_model("large")
-        trans = model.transcribe(audio_file, language=source_language, verbose=False, word_timestamps=True)
+        for segment in segments:
+            yield _segment_to_dict(segment)
+    except Exception as e:
+        raise Exception(f"Error transcribing audio: {e}") from e
+
+
+# Whisper models that can be selected for transcription
+whisper_model_sizes = ["distil-large-v3", "large-v3-turbo", "large-v3", "medium"]
+
+
+def default_model_size(source_language):
+    # distil-large-v3 is only trained for English, other languages use the multilingual turbo model
+    return "distil-large-v3" if source_language == "english" else "large-v3-turbo"
+
+
+def transcribe_audio(audio_file, source_language, model_size=None):
+    """
+    Start transcribing the audio track. "segments" is a generator that decodes the audio
+    as it is consumed, so the translation and synthesis steps overlap with transcription
+    """
+    try:
+        model_size = model_size or default_model_size(source_language)
+        print(f"Transcribing audio track with Whisper {model_size}")
+        model = _get_whisper_model(model_size)
+        # Silero VAD drops non-speech before decoding, which keeps word timestamps tight around speech
+        segments, info = model.transcribe(
+            audio_file,
+            language=language_codes[source_language],
+            word_timestamps=True,
+            vad_filter=True,
+            vad_parameters={"min_silence_duration_ms": SENTENCE_PAUSE_MS}
+        )
+        trans = {
+            "segments": _decode_segments(segments),
+            "language": info.language
+        }
         return trans
     except Exception as e:
         print(f"Error transcribing audio: {e}")
         return None
 
 
-def translate_text(texts, target_language, source_language="auto"):
+class _LingoWorker:
+    """
+    Persistent `lingo_translate.js --server` process, started once and reused for every batch.
+    It serves translations over HTTP on a Unix domain socket and streams them back chunk by chunk
+    """
+
+    def __init__(self, node_path, script_path, env, startup_timeout=10):
+        self.socket_path = os.path.join(tempfile.gettempdir(), f"lingo-{os.getpid()}.sock")
+        self.client = None
+        # A socket left behind by a previous worker would look like a ready server
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.process = subprocess.Popen([node_path, script_path, "--server", self.socket_path], env=env)
+        deadline = time.monotonic() + startup_timeout
+        while not self._accepts_connections():
+            if not self.is_alive():
+                self.close()
+                raise Exception("Lingo.dev worker exited during startup")
+            if time.monotonic() > deadline:
+                self.close()
+                raise Exception("Lingo.dev worker did not start listening in time")
+            time.sleep(0.05)
+        self.client = httpx.Client(transport=httpx.HTTPTransport(uds=self.socket_path), timeout=60)
+
+    def _accepts_connections(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+                return True
+            except OSError:
+                return False
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def translate(self, texts, target_language, source_language, on_translation=None):
+        translations = [None] * len(texts)
+        request = {"src": source_language, "tgt": target_language, "texts": texts}
+        with self.client.stream("POST", "http://lingo/translate", json=request) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    raise Exception(f"Lingo.dev SDK error: {message['error']}")
+                for index, translation in message["translations"].items():
+                    translations[int(index)] = translation
+                    if on_translation is not None:
+                        on_translation(int(index), translation)
+        return translations
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        if self.is_alive():
+            self.process.kill()
+            self.process.wait()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+_lingo_worker = None
+_lingo_worker_lock = threading.Lock()
+
+
+def _get_lingo_worker(node_path, script_path, env):
+    global _lingo_worker
+    with _lingo_worker_lock:
+        if _lingo_worker is None or not _lingo_worker.is_alive():
+            if _lingo_worker is not None:
+                _lingo_worker.close()
+            _lingo_worker = _LingoWorker(node_path, script_path, env)
+            atexit.register(_lingo_worker.close)
+        return _lingo_worker
+
+
+def translate_text(texts, target_language, source_language="auto", on_translation=None):
     """
     Translate texts using Lingo.dev JavaScript SDK (primary) or Google Translate (fallback)
     Based on: https://docs.lingo.dev/ and https://lingo.dev/en/sdk/javascript
+    on_translation(index, translation) is called at most once per text, as soon as it is translated
     """
+    # Translations already delivered, kept if Lingo.dev fails part way through a batch
+    delivered = {}
+
+    def deliver(index, translation):
+        delivered[index] = translation
+        if on_translation is not None:
+            on_translation(index, translation)
+
     # Try Lingo.dev JavaScript SDK first
     # Lingo.dev uses LINGODOTDEV_API_KEY as the environment variable name
     lingo_api_key = os.getenv("LINGODOTDEV_API_KEY") or os.getenv("LINGO_API_KEY")
     if lingo_api_key and lingo_api_key != "your_lingo_api_key_here":
         try:
-            # Use the JavaScript SDK via Node.js
-            import subprocess
-            import json
-            import shutil
-            
+            # Use the JavaScript SDK via a persistent Node.js worker
             # Check if Node.js is available
             node_path = shutil.which("node")
             if not node_path:
@@ -92,45 +249,20 @@ def translate_text(texts, target_language, source_language="auto"):
             if not os.path.exists(script_path):
                 raise Exception(f"Lingo.dev translation script not found at {script_path}")
             
-            # Prepare command: node lingo_translate.js <sourceLocale> <targetLocale> <text1> <text2> ...
-            cmd = [node_path, script_path, source_language, target_language] + texts
-            
             # Set environment variable for API key
             env = os.environ.copy()
             env["LINGODOTDEV_API_KEY"] = lingo_api_key
             env["LINGO_API_KEY"] = lingo_api_key  # Also set as backup
             
-            # Run the Node.js script
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60,
-                env=env
-            )
-            
-            if result.returncode == 0:
-                # Parse JSON output (one translation per line)
-                translated_texts = []
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip():
-                        try:
-                            # Each line is a JSON string
-                            translation = json.loads(line)
-                            translated_texts.append(translation)
-                        except json.JSONDecodeError:
-                            # If not JSON, use the line as-is
-                            translated_texts.append(line)
-                
-                if len(translated_texts) == len(texts):
-                    return translated_texts
-                else:
-                    raise Exception(f"Translation count mismatch: expected {len(texts)}, got {len(translated_texts)}")
+            worker = _get_lingo_worker(node_path, script_path, env)
+            translated_texts = worker.translate(texts, target_language, source_language, deliver)
+            if None not in translated_texts:
+                return translated_texts
             else:
-                error_msg = result.stderr.strip() or result.stdout.strip()
-                raise Exception(f"Lingo.dev SDK error: {error_msg}")
+                missing = translated_texts.count(None)
+                raise Exception(f"Translation count mismatch: expected {len(texts)}, got {len(texts) - missing}")
                 
-        except subprocess.TimeoutExpired:
+        except httpx.TimeoutException:
             print("Lingo.dev SDK translation timed out, falling back to Google Translate")
             # Fall through to Google Translate
         except FileNotFoundError:
@@ -147,9 +279,14 @@ def translate_text(texts, target_language, source_language="auto"):
         if not creds_path or not os.path.exists(creds_path):
             raise Exception("Google credentials file not found")
         
-        translate_client = translate.Client()
-        results = translate_client.translate(texts, target_language=target_language)
-        return [result['translatedText'] for result in results]
+        # Only translate what Lingo.dev did not deliver
+        missing = [i for i in range(len(texts)) if i not in delivered]
+        if missing:
+            translate_client = translate.Client()
+            results = translate_client.translate([texts[i] for i in missing], target_language=target_language)
+            for i, result in zip(missing, results):
+                deliver(i, result['translatedText'])
+        return [delivered[i] for i in range(len(texts))]
     except Exception as e:
         error_msg = str(e)
         if "does not have a valid type" in error_msg or "Type is None" in error_msg:
@@ -170,27 +307,92 @@ def translate_text(texts, target_language, source_language="auto"):
         return None
 
 
+@functools.lru_cache(maxsize=1)
+def _get_tts_client():
+    # The client is thread-safe, so a single instance is shared by the synthesis pool
+    return texttospeech.TextToSpeechClient()
+
+
+TTS_SPEAKING_RATE = 1.1
+
+# Synthesized sentences are cached on disk, least recently used files are evicted above the size limit
+TTS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "video_dubber")
+TTS_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+_tts_cache_lock = threading.Lock()
+
+
+def _evict_tts_cache():
+    """Trim the cache to its size limit, run once per dub rather than per synthesized sentence"""
+    if not os.path.isdir(TTS_CACHE_DIR):
+        return
+    with _tts_cache_lock:
+        entries = []
+        for entry in os.scandir(TTS_CACHE_DIR):
+            if entry.name.endswith(".wav") and not entry.name.startswith("translated_"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= TTS_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+
+def _cached_tts(func):
+    """Serve synthesized audio from the disk cache, keyed by text, voice, language and speaking rate"""
+    @functools.wraps(func)
+    def wrapper(text, target_language, target_voice):
+        key = hashlib.blake2b(f"{text}|{target_voice}|{target_language}|{TTS_SPEAKING_RATE}".encode()).hexdigest()
+        cache_file = os.path.join(TTS_CACHE_DIR, key + ".wav")
+        try:
+            os.utime(cache_file)  # mark as recently used
+            return AudioSegment.from_wav(cache_file)
+        except FileNotFoundError:
+            pass  # not cached yet, or evicted in the meantime
+        audio = func(text, target_language, target_voice)
+        # Written next to the cache so the finished file can be atomically moved into it
+        temp_file = os.path.join(TTS_CACHE_DIR, "translated_" + str(uuid.uuid4()) + ".wav")
+        try:
+            os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+            audio.export(temp_file, format="wav")
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            # The cache is only an optimisation, the synthesized audio is still usable
+            print(f"Could not cache synthesized audio: {e}")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+        return audio
+    return wrapper
+
+
+@_cached_tts
 def create_audio_from_text(text, target_language, target_voice):
-    audio_file = "translated_" + str(uuid.uuid4()) + ".wav"
     try:
-        client = texttospeech.TextToSpeechClient()
+        client = _get_tts_client()
         input_text = texttospeech.SynthesisInput(text=text)
         voice = texttospeech.VoiceSelectionParams(
             language_code=target_language,
             name=target_voice
         )
         audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16, speaking_rate=1.1
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16, speaking_rate=TTS_SPEAKING_RATE
         )
         response = client.synthesize_speech(
             request={"input": input_text, "voice": voice, "audio_config": audio_config}
         )
-        with open(audio_file, "wb") as out:
-            out.write(response.audio_content)
-        return audio_file
+        # LINEAR16 responses are complete WAV files, so they can be decoded straight from memory
+        return AudioSegment.from_file(io.BytesIO(response.audio_content), format="wav")
     except Exception as e:
-        if os.path.isfile(audio_file):
-            os.remove(audio_file)
         raise Exception(f"Error creating audio from text: {e}")
 
 
@@ -215,110 +417,215 @@ ABBREVIATIONS = {
     "Corp.": "corporation"
 }
 
-ISWORD = re.compile(r'.*\w.*')
+ISWORD = re.compile(r'\w')
+
+SENTENCE_ENDINGS = (".", "!", "?")
+
+# Silence after a segment, in ms, that is treated as the end of a sentence
+SENTENCE_PAUSE_MS = 500
+
+# Maximum number of sentences sent to the translator per request
+TRANSLATION_CHUNK_SIZE = 128
+
+# Number of concurrent Text-to-Speech requests
+TTS_MAX_WORKERS = 16
+
+# Volume reduction of the original audio under a translated sentence, in dB
+DUCKING_GAIN = -10
+
+
+def _ms_to_frame(ms, frame_rate):
+    return max(0, int(ms * frame_rate / 1000))
+
+
+def _audio_to_samples(audio):
+    return np.array(audio.get_array_of_samples()).reshape(-1, audio.channels)
+
+
+def _apply_gain_ramp(samples, start, end, from_gain, to_gain):
+    """Scale samples[start:end] in place by a linear gain ramp (like pydub's fades)"""
+    end = min(end, len(samples))
+    if end <= start:
+        return
+    gains = np.linspace(from_gain, to_gain, end - start, endpoint=False, dtype=np.float32)
+    samples[start:end] = samples[start:end] * gains[:, np.newaxis]
+
+
+def _overlay_samples(samples, overlay, start):
+    """Mix overlay into samples at start in place, clipping like pydub's overlay"""
+    end = min(start + len(overlay), len(samples))
+    if end <= start:
+        return
+    limits = np.iinfo(samples.dtype)
+    mixed = samples[start:end].astype(np.int64) + overlay[:end - start]
+    samples[start:end] = np.clip(mixed, limits.min, limits.max)
+
+
+def _build_translated_track(translated_audios, sentence_ends):
+    """
+    Lay out the translated sentences on one preallocated buffer, each right after the previous one
+    but delayed with silence so that it does not end before the original sentence did
+    """
+    if not translated_audios:
+        return AudioSegment.silent(duration=0)
+    frame_rate = max(audio.frame_rate for audio in translated_audios)
+    channels = max(audio.channels for audio in translated_audios)
+    sample_width = max(audio.sample_width for audio in translated_audios)
+    chunks = [_audio_to_samples(audio.set_frame_rate(frame_rate).set_channels(channels).set_sample_width(sample_width))
+              for audio in translated_audios]
+    offsets = []
+    position = 0
+    for chunk, sentence_end in zip(chunks, sentence_ends):
+        position = max(position, _ms_to_frame(int(sentence_end * 1000), frame_rate) - len(chunk))
+        offsets.append(position)
+        position += len(chunk)
+    samples = np.zeros((position, channels), dtype=chunks[0].dtype)
+    for chunk, offset in zip(chunks, offsets):
+        samples[offset:offset + len(chunk)] = chunk
+    return AudioSegment(data=samples.tobytes(), sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+
+
+def _usable_segments(segments):
+    """Yield (segment, words) for segments with spoken words, skipping all-caps segments and those without words"""
+    for segment in segments:
+        if segment["text"].isupper():
+            continue
+        words = [word for word in segment["words"] if ISWORD.search(word["word"])]
+        if words:
+            yield segment, words
+
+
+def _compose_sentences(segments):
+    """
+    Group transcribed words into sentences, yielding (sentence, start, end) as soon as each one is complete.
+    A sentence ends on closing punctuation, or at the end of a segment followed by a pause in speech
+    """
+    sentence = ""
+    sent_start = None
+    sent_end = None
+    segments = _usable_segments(segments)
+    current = next(segments, None)
+    while current is not None:
+        segment, words = current
+        current = next(segments, None)
+        for i, word in enumerate(words):
+            word["word"] = ABBREVIATIONS.get(word["word"].strip(), word["word"])
+            if word["word"].startswith("-"):
+                sentence = sentence[:-1] + word["word"] + " "
+            else:
+                sentence += word["word"] + " "
+            if sent_start is None:
+                sent_start = word["start"]
+            sent_end = word["end"]
+            if i == len(words) - 1 and not word["word"].endswith(SENTENCE_ENDINGS):  # last word in segment
+                pause = None if current is None else current[0]["start"] - word["end"]
+                if pause is None or pause * 1000 >= SENTENCE_PAUSE_MS:
+                    word["word"] += "."
+
+            if word["word"].endswith(SENTENCE_ENDINGS):
+                yield sentence, sent_start, word["end"]
+                sent_start = None
+                sentence = ""
+    if sentence:
+        yield sentence, sent_start, sent_end
+
+
+def _translate_and_synthesize(sentences, source_language, target_language, target_voice, tts_executor):
+    """Translate a chunk of sentences, queueing each one's speech synthesis as soon as its translation arrives"""
+    audio_futures = [None] * len(sentences)
+
+    def synthesize(i, translation):
+        audio_futures[i] = tts_executor.submit(create_audio_from_text, translation, target_language, target_voice)
+
+    translated_chunk = translate_text(sentences, target_language, language_codes[source_language],
+                                      on_translation=synthesize)
+    if translated_chunk is None:
+        raise Exception("Translation failed")
+    return audio_futures
+
 
 def merge_audio_files(transcription, source_language, target_language, target_voice, audio_file):
-    temp_files = []
     try:
-        ducked_audio = AudioSegment.from_wav(audio_file)
-        if spacy_models[source_language] not in spacy.util.get_installed_models():
-            spacy.cli.download(spacy_models[source_language])
-        nlp = spacy.load(spacy_models[source_language])
-        nlp.add_pipe("syllables", after="tagger")
-        merged_audio = AudioSegment.silent(duration=0)
+        original_audio = AudioSegment.from_wav(audio_file)
         sentences = []
         sentence_starts = []
         sentence_ends = []
-        sentence = ""
-        sent_start = 0
-        print("Composing sentences")
-        for segment in tqdm(transcription["segments"]):
-            if segment["text"].isupper():
-                continue
-            for i, word in enumerate(segment["words"]):
-                if not ISWORD.search(word["word"]):
-                    continue
-                word["word"] = ABBREVIATIONS.get(word["word"].strip(), word["word"])
-                if word["word"].startswith("-"):
-                    sentence = sentence[:-1] + word["word"] + " "
-                else:
-                    sentence += word["word"] + " "
-                # this is a trick to compensate the absense of VAD in Whisper
-                word_syllables = sum(token._.syllables_count for token in nlp(word["word"]) if token._.syllables_count)
-                segment_syllables = sum(token._.syllables_count for token in nlp(segment["text"]) if token._.syllables_count)
-                if i == 0 or sent_start == 0:
-                    word_speed = word_syllables / (word["end"] - word["start"])
-                    if word_speed < 3:
-                        sent_start = word["end"] - word_syllables / 3
-                    else:
-                        sent_start = word["start"]
-                if i == len(segment["words"]) - 1:  # last word in segment
-                    word_speed = word_syllables / (word["end"] - word["start"])
-                    segment_speed = segment_syllables / (segment["end"] - segment["start"])
-                    if word_speed < 1.0 or segment_speed < 2.0:
-                        word["word"] += "."
-
-                if word["word"].endswith("."):
-                    sentences.append(sentence)
-                    sentence_starts.append(sent_start)
-                    sentence_ends.append(word["end"])
-                    sent_start = 0
-                    sentence = ""
-        # translate sentences in chunks of 128
-        print("Translating sentences")
-        translated_texts = []
-        for i in tqdm(range(0, len(sentences), 128)):
-            chunk = sentences[i:i + 128]
-            translated_chunk = translate_text(chunk, target_language, source_language)
-            if translated_chunk is None:
-                raise Exception("Translation failed")
-            translated_texts.extend(translated_chunk)
+        # Sentences are translated while transcription is still running: whatever has accumulated is sent
+        # as soon as the translator is idle (up to a full chunk), and each translated sentence is
+        # synthesized while the next ones are being translated.
+        # Repeated sentences are only translated and synthesized once.
+        print("Composing, translating and synthesizing sentences")
+        audio_futures = {}  # sentence -> (translation future, index of the sentence in its chunk)
+        pending = {}  # sentences waiting for the translator
+        last_translation = None
+        with ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS) as tts_executor, \
+                ThreadPoolExecutor(max_workers=1) as translate_executor:
+            def submit_translation():
+                nonlocal last_translation
+                chunk = list(pending)
+                last_translation = translate_executor.submit(
+                    _translate_and_synthesize, chunk, source_language, target_language, target_voice, tts_executor)
+                for i, sentence in enumerate(chunk):
+                    audio_futures[sentence] = (last_translation, i)
+                pending.clear()
+
+            for sentence, sent_start, sent_end in _compose_sentences(transcription["segments"]):
+                sentences.append(sentence)
+                sentence_starts.append(sent_start)
+                sentence_ends.append(sent_end)
+                if sentence not in audio_futures:
+                    pending[sentence] = None
+                    translator_idle = last_translation is None or last_translation.done()
+                    if translator_idle or len(pending) == TRANSLATION_CHUNK_SIZE:
+                        submit_translation()
+            if pending:
+                submit_translation()
+
+            translated_audios = []
+            for sentence in tqdm(sentences):
+                future, i = audio_futures[sentence]
+                translated_audio = future.result()[i].result()
+                if translated_audio is None:
+                    raise Exception("Audio creation failed")
+                translated_audios.append(translated_audio)
         print("Creating translated audio track")
+        # Duck the original audio in place on a single sample buffer instead of re-concatenating segments per sentence
+        frame_rate = original_audio.frame_rate
+        samples = _audio_to_samples(original_audio)
+        ducking_gain = 10 ** (DUCKING_GAIN / 20)
         prev_end_time = 0
-        for i, translated_text in enumerate(tqdm(translated_texts)):
-            translated_audio_file = create_audio_from_text(translated_text, target_language, target_voice)
-            if translated_audio_file is None:
-                raise Exception("Audio creation failed")
-            temp_files.append(translated_audio_file)
-            translated_audio = AudioSegment.from_wav(translated_audio_file)
-
+        for i, translated_audio in enumerate(tqdm(translated_audios)):
             # Apply "ducking" effect: reduce volume of original audio during translated sentence
             start_time = int(sentence_starts[i] * 1000)
             end_time = start_time + len(translated_audio)
-            next_start_time = int(sentence_starts[i+1] * 1000) if i < len(translated_texts) - 1 else len(ducked_audio)
-            ducked_segment = ducked_audio[start_time:end_time].apply_gain(-10)  # adjust volume reduction as needed
+            next_start_time = int(sentence_starts[i+1] * 1000) if i < len(translated_audios) - 1 else len(original_audio)
+            start_frame = _ms_to_frame(start_time, frame_rate)
+            end_frame = _ms_to_frame(end_time, frame_rate)
+            _apply_gain_ramp(samples, start_frame, end_frame, ducking_gain, ducking_gain)
 
             fade_out_duration = min(500, max(1, start_time - prev_end_time))
             fade_in_duration = min(500, max(1, next_start_time  - end_time))
             prev_end_time = end_time
-            # Apply fade in effect to the end of the audio before the ducked segment
-            if start_time == 0:
-                ducked_audio = ducked_segment +  ducked_audio[end_time:].fade_in(fade_in_duration)
-            elif end_time == len(ducked_audio):
-                ducked_audio = ducked_audio[:start_time].fade_out(fade_out_duration) + ducked_segment
-            else:
-                ducked_audio = ducked_audio[:start_time].fade_out(fade_out_duration) \
-                               + ducked_segment +  ducked_audio[end_time:].fade_in(fade_in_duration)
+            # Fade out the audio before the ducked segment and fade it back in after it
+            _apply_gain_ramp(samples, _ms_to_frame(start_time - fade_out_duration, frame_rate), start_frame, 1.0, 0.0)
+            _apply_gain_ramp(samples, end_frame, _ms_to_frame(end_time + fade_in_duration, frame_rate), 0.0, 1.0)
 
             # Overlay the translated audio on top of the original audio
-            ducked_audio = ducked_audio.overlay(translated_audio, position=start_time)
-
-            original_duration = int(sentence_ends[i] * 1000)
-            new_duration = len(translated_audio) + len(merged_audio)
-            padding_duration = max(0, original_duration - new_duration)
-            padding = AudioSegment.silent(duration=padding_duration)
-            merged_audio += padding + translated_audio
+            overlay_audio = translated_audio.set_frame_rate(frame_rate) \
+                .set_channels(original_audio.channels).set_sample_width(original_audio.sample_width)
+            _overlay_samples(samples, _audio_to_samples(overlay_audio), start_frame)
+        ducked_audio = AudioSegment(
+            data=samples.tobytes(),
+            sample_width=original_audio.sample_width,
+            frame_rate=frame_rate,
+            channels=original_audio.channels
+        )
+        merged_audio = _build_translated_track(translated_audios, sentence_ends)
+        _evict_tts_cache()
         return merged_audio, ducked_audio
     except Exception as e:
         print(f"Error merging audio files: {e}")
         return None
-    finally:
-        # cleanup: remove all temporary files
-        for file in temp_files:
-            try:
-                os.remove(file)
-            except Exception as e:
-                print(f"Error removing temporary file {file}: {e}")
 
 
 def save_audio_to_file(audio, filename):
@@ -330,39 +637,57 @@ def save_audio_to_file(audio, filename):
 
 
 
+def _get_media_duration(media_file):
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", media_file],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+
+# Video codecs that can be stream-copied into an MP4 container, anything else (e.g. FLV1, WMV3) is re-encoded
+MP4_VIDEO_CODECS = {"h264", "hevc", "av1", "vp9", "mpeg4"}
+
+
+def _get_video_codec(video_file):
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=codec_name",
+         "-of", "default=noprint_wrappers=1:nokey=1", video_file],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
 def replace_audio_in_video(video_file, new_audio):
+    temp_audio_file = None
     try:
-        # Load the video
-        video = VideoFileClip(video_file)
-
         # Save the new audio to a temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio_file:
             new_audio.export(temp_audio_file.name, format="wav")
-        new_audio.export("duckled.wav", format="wav")
-
-        # Load the new audio into an AudioFileClip
-        try:
-            new_audio_clip = AudioFileClip(temp_audio_file.name)
-        except Exception as e:
-            print(f"Error loading new audio into an AudioFileClip: {e}")
-            return
 
         # Check if the audio is compatible with the video
-        if new_audio_clip.duration < video.duration:
+        video_duration = _get_media_duration(video_file)
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", video_file, "-i", temp_audio_file.name,
+               "-c:a", "aac", "-b:a", "192k", "-map", "0:v:0", "-map", "1:a:0"]
+        if new_audio.duration_seconds < video_duration:
             print("Warning: The new audio is shorter than the video. The remaining video will have no sound.")
-        elif new_audio_clip.duration > video.duration:
+        elif new_audio.duration_seconds > video_duration:
             print("Warning: The new audio is longer than the video. The extra audio will be cut off.")
-            new_audio_clip = new_audio_clip.subclip(0, video.duration)
+            cmd.append("-shortest")
 
-        # Set the audio of the video to the new audio
-        video = video.set_audio(new_audio_clip)
-
-        # Write the result to a new video file
+        # Write the result to a new video file, copying the video stream as is when MP4 can hold it
+        video_codec = _get_video_codec(video_file)
+        if video_codec in MP4_VIDEO_CODECS:
+            cmd += ["-c:v", "copy"]
+        else:
+            print(f"Video codec {video_codec} cannot be copied into MP4, re-encoding it to H.264")
+            cmd += ["-c:v", "libx264", "-pix_fmt", "yuv420p"]
         output_filename = os.path.splitext(video_file)[0] + "_translated.mp4"
         try:
-            video.write_videofile(output_filename, audio_codec='aac')
-        except Exception as e:
-            print(f"Error writing the new video file: {e}")
+            subprocess.run(cmd + [output_filename], capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            print(f"Error writing the new video file: {e.stderr.strip()}")
             return
 
         print(f"Translated video saved as {output_filename}")
@@ -371,7 +696,7 @@ def replace_audio_in_video(video_file, new_audio):
         print(f"Error replacing audio in video: {e}")
     finally:
         # Remove the temporary audio file
-        if os.path.isfile(temp_audio_file.name):
+        if temp_audio_file is not None and os.path.isfile(temp_audio_file.name):
             os.remove(temp_audio_file.name)
 
 
@@ -382,23 +707,30 @@ def main():
                         help=f'Target dubbing voice name from https://cloud.google.com/text-to-speech/docs/voices')
     parser.add_argument('--credentials', type=str, help='Path to the Google Cloud credentials JSON file', required=True)
     parser.add_argument('--source_language', type=str, help=f'Source language, e.g. english. Now the following languages are supported:'
-                                                            f' {list(spacy_models.keys())}', default="english")
+                                                            f' {list(language_codes.keys())}', default="english")
+    parser.add_argument('--model_size', type=str, choices=whisper_model_sizes,
+                        help='Whisper model, defaults to distil-large-v3 for English and large-v3-turbo otherwise')
     args = parser.parse_args()
 
     # Set the GOOGLE_APPLICATION_CREDENTIALS environment variable
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = args.credentials
 
-    audio_file = extract_audio_from_video(args.input)
+    audio_file, asr_audio_file = extract_audio_from_video(args.input)
     if audio_file is None:
         return
 
-    transcription = transcribe_audio(audio_file, args.source_language.lower())
-    if transcription is None:
-        return
+    try:
+        transcription = transcribe_audio(asr_audio_file, args.source_language.lower(), args.model_size)
+        if transcription is None:
+            return
 
-    merged_audio, ducked_audio = merge_audio_files(transcription, args.source_language.lower(), args.voice[:5], args.voice, audio_file)
-    if merged_audio is None:
-        return
+        merged_audio, ducked_audio = merge_audio_files(transcription, args.source_language.lower(), args.voice[:5], args.voice, audio_file)
+        if merged_audio is None:
+            return
+    finally:
+        # The Whisper copy of the audio is only needed until transcription has been consumed
+        if os.path.isfile(asr_audio_file):
+            os.remove(asr_audio_file)
     replace_audio_in_video(args.input, ducked_audio)
     # Save the audio file with the same name as the video file but with a ".wav" extension
     output_filename = os.path.splitext(args.input)[0] + ".wav"